@@ -4,9 +4,16 @@ FRED Data Download Script for Employment Statistics Re-analysis
 Downloads PAYEMS (Total Nonfarm Payroll Employment) from FRED with timestamped snapshots
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import datetime
+import os
 import pathlib
 import logging
 import sys
@@ -27,6 +34,11 @@ class FREDDataDownloader:
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.fred_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=PAYEMS"
         
+        # Reuse one keep-alive session with retries and compressed transfers
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3)))
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        
     def download_payems(self, date_suffix: Optional[str] = None) -> pd.DataFrame:
         """
         Download PAYEMS data from FRED
@@ -39,14 +51,22 @@ class FREDDataDownloader:
         """
         try:
             logger.info(f"Downloading PAYEMS data from FRED...")
-            response = requests.get(self.fred_url, timeout=30)
-            response.raise_for_status()
-            
-            # Parse CSV data
-            df = pd.read_csv(pd.io.common.StringIO(response.text), parse_dates=["DATE"])
+            with self.session.get(self.fred_url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                
+                # Stream the (decompressed) body straight into Arrow's multi-threaded CSV reader
+                # (FRED marks missing observations with ".")
+                response.raw.decode_content = True
+                table = pacsv.read_csv(
+                    response.raw,
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={"DATE": pa.timestamp("ns")},
+                        null_values=[".", ""]
+                    )
+                )
             
             # Remove any rows with missing values
-            df = df.dropna()
+            df = table.drop_null().to_pandas()
             
             # Validate data
             if len(df) == 0:
@@ -78,16 +98,11 @@ class FREDDataDownloader:
         if date_suffix is None:
             date_suffix = datetime.date.today().strftime("%Y%m%d")
             
-        filename = f"PAYEMS_{date_suffix}.csv"
+        filename = f"PAYEMS_{date_suffix}.feather"
         filepath = self.base_dir / filename
         
-        # Save with timestamp and metadata
-        df_with_meta = df.copy()
-        df_with_meta.attrs['download_date'] = datetime.datetime.now().isoformat()
-        df_with_meta.attrs['source'] = 'FRED'
-        df_with_meta.attrs['series_id'] = 'PAYEMS'
-        
-        df.to_csv(filepath, index=False)
+        # Feather V2 (Arrow IPC) with Zstd keeps dtypes and is much faster to reload than CSV
+        feather.write_feather(df, filepath, compression="zstd", compression_level=9)
         logger.info(f"Saved snapshot to {filepath}")
         
         return filepath
@@ -99,16 +114,26 @@ class FREDDataDownloader:
         Returns:
             Most recent DataFrame or None if no snapshots exist
         """
-        snapshot_files = list(self.base_dir.glob("PAYEMS_*.csv"))
-        
-        if not snapshot_files:
+        # Single directory pass for the latest date suffix (Feather wins over a legacy CSV of the same date)
+        with os.scandir(self.base_dir) as entries:
+            latest_entry = max(
+                (entry for entry in entries
+                 if entry.name.startswith("PAYEMS_") and entry.name.endswith((".feather", ".csv"))),
+                key=lambda entry: (os.path.splitext(entry.name)[0], entry.name.endswith(".feather")),
+                default=None
+            )
+        
+        if latest_entry is None:
             logger.warning("No snapshots found")
             return None
             
-        # Sort by filename (date) and get the latest
-        latest_file = sorted(snapshot_files)[-1]
+        latest_file = pathlib.Path(latest_entry.path)
         logger.info(f"Loading latest snapshot: {latest_file}")
         
+        if latest_file.suffix == ".feather":
+            return feather.read_table(latest_file, memory_map=True).to_pandas()
+        
+        # Legacy CSV snapshot
         return pd.read_csv(latest_file, parse_dates=["DATE"])
     
     def compare_with_previous(self, current_df: pd.DataFrame) -> dict:
@@ -126,38 +151,38 @@ class FREDDataDownloader:
         if previous_df is None:
             return {"status": "no_previous_data"}
         
-        # Find overlapping date range
-        common_dates = set(current_df['DATE']).intersection(set(previous_df['DATE']))
-        
-        if not common_dates:
-            return {"status": "no_overlap"}
-        
-        # Merge on common dates
+        # Hash join on the overlapping dates
         comparison = pd.merge(
-            current_df[current_df['DATE'].isin(common_dates)][['DATE', 'PAYEMS']],
-            previous_df[previous_df['DATE'].isin(common_dates)][['DATE', 'PAYEMS']],
+            current_df[['DATE', 'PAYEMS']],
+            previous_df[['DATE', 'PAYEMS']],
             on='DATE',
+            how='inner',
             suffixes=('_current', '_previous')
         )
         
+        if comparison.empty:
+            return {"status": "no_overlap"}
+        
         # Calculate differences
-        comparison['diff'] = comparison['PAYEMS_current'] - comparison['PAYEMS_previous']
+        diff = comparison['PAYEMS_current'].to_numpy() - comparison['PAYEMS_previous'].to_numpy()
+        changed_mask = diff != 0
         
         # Summary statistics
-        n_changed = (comparison['diff'] != 0).sum()
-        max_change = comparison['diff'].abs().max()
+        n_changed = int(changed_mask.sum())
+        max_change = np.abs(diff).max()
         
         result = {
             "status": "compared",
             "total_common_records": len(comparison),
             "records_changed": n_changed,
             "max_absolute_change": max_change,
-            "revision_dates": comparison[comparison['diff'] != 0]['DATE'].tolist()
+            # Only the first 5 revised dates are reported; records_changed holds the full count
+            "revision_dates": comparison['DATE'].iloc[np.flatnonzero(changed_mask)[:5]].tolist()
         }
         
         if n_changed > 0:
             logger.warning(f"Found {n_changed} revised records with max change of {max_change}")
-            for date in result["revision_dates"][:5]:  # Show first 5
+            for date in result["revision_dates"]:
                 logger.warning(f"Revision detected for {date}")
         else:
             logger.info("No revisions detected compared to previous snapshot")
@@ -6,7 +6,11 @@ Combines FRED final data with BLS release data to calculate revision errors
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
 import glob
+import os
 import pathlib
 import logging
 import sys
@@ -36,6 +40,20 @@ class RevisionMerger:
         self.standard_error = 85000
         self.confidence_interval_90 = 136000
         
+    def _read_csv(self, path: pathlib.Path, column_types: Dict[str, pa.DataType]) -> pd.DataFrame:
+        """
+        Read a CSV file with Arrow's multi-threaded reader
+        
+        Args:
+            path: CSV file to read
+            column_types: Explicit Arrow types for known columns (absent columns are ignored)
+            
+        Returns:
+            DataFrame converted from the Arrow table
+        """
+        table = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=column_types))
+        return table.to_pandas()
+    
     def load_latest_fred_data(self) -> pd.DataFrame:
         """
         Load the most recent FRED snapshot
@@ -43,16 +61,25 @@ class RevisionMerger:
         Returns:
             DataFrame with DATE and PAYEMS columns
         """
-        fred_files = list(self.fred_dir.glob("PAYEMS_*.csv"))
+        # Single directory pass for the most recent file (Feather wins over a legacy CSV of the same date)
+        with os.scandir(self.fred_dir) as entries:
+            latest_entry = max(
+                (entry for entry in entries
+                 if entry.name.startswith('PAYEMS_') and entry.name.endswith(('.feather', '.csv'))),
+                key=lambda entry: (os.path.splitext(entry.name)[0], entry.name.endswith('.feather')),
+                default=None
+            )
         
-        if not fred_files:
+        if latest_entry is None:
             raise FileNotFoundError(f"No FRED snapshots found in {self.fred_dir}")
             
-        # Get the most recent file
-        latest_file = sorted(fred_files)[-1]
+        latest_file = pathlib.Path(latest_entry.path)
         logger.info(f"Loading FRED data from {latest_file}")
         
-        df = pd.read_csv(latest_file, parse_dates=['DATE'])
+        if latest_file.suffix == '.feather':
+            df = feather.read_table(latest_file, memory_map=True).to_pandas()
+        else:
+            df = self._read_csv(latest_file, {'DATE': pa.timestamp('ns')})
         df.rename(columns={'PAYEMS': 'final'}, inplace=True)
         
         # Convert to thousands (FRED is in thousands, BLS releases often in levels)
@@ -75,10 +102,15 @@ class RevisionMerger:
         
         if parquet_path.exists():
             logger.info(f"Loading BLS releases from {parquet_path}")
-            df = pd.read_parquet(parquet_path)
+            df = pd.read_parquet(parquet_path, memory_map=True)
         elif csv_path.exists():
             logger.info(f"Loading BLS releases from {csv_path}")
-            df = pd.read_csv(csv_path, parse_dates=['date'])
+            df = self._read_csv(csv_path, {
+                'date': pa.timestamp('ns'),
+                'release1': pa.float64(),
+                'release2': pa.float64(),
+                'release3': pa.float64()
+            })
         else:
             raise FileNotFoundError(f"No BLS release data found in {self.bls_dir}")
             
@@ -111,22 +143,13 @@ class RevisionMerger:
         Returns:
             Merged DataFrame
         """
-        # Merge on date
-        merged = pd.merge(
-            fred_df, 
-            bls_df, 
-            left_on='DATE', 
-            right_on='date', 
+        # Outer join on a shared DatetimeIndex; the union index comes back sorted by date
+        merged = fred_df.rename(columns={'DATE': 'date'}).set_index('date').join(
+            bls_df.set_index('date'),
             how='outer',
-            suffixes=('_fred', '_bls')
-        )
-        
-        # Use the common date column
-        merged['date'] = merged['DATE'].fillna(merged['date'])
-        merged.drop(['DATE', 'date_bls'], axis=1, errors='ignore', inplace=True)
-        
-        # Sort by date
-        merged = merged.sort_values('date').reset_index(drop=True)
+            lsuffix='_fred',
+            rsuffix='_bls'
+        ).reset_index()
         
         logger.info(f"Merged dataset has {len(merged)} records")
         
@@ -142,7 +165,8 @@ class RevisionMerger:
         Returns:
             DataFrame with revision calculations
         """
-        df = df.copy()
+        # Shallow copy: new columns are added without duplicating the input data
+        df = df.copy(deep=False)
         
         # Ensure we have the required columns
         release_cols = ['release1', 'release2', 'release3']
@@ -154,51 +178,53 @@ class RevisionMerger:
             df['release1'] = df['final']
             available_releases = ['release1']
         
+        # Pull each input column out once; the arithmetic below runs on raw arrays without index alignment
+        values = {col: df[col].to_numpy() for col in ['final'] + release_cols if col in df.columns}
+        
         # Calculate revisions between consecutive releases
-        if 'release2' in df.columns and 'release1' in df.columns:
-            df['rev_2to1'] = df['release2'] - df['release1']  # 2nd release vs 1st release
+        if 'release2' in values and 'release1' in values:
+            df['rev_2to1'] = values['release2'] - values['release1']  # 2nd release vs 1st release
         else:
             df['rev_2to1'] = np.nan
             
-        if 'release3' in df.columns and 'release2' in df.columns:
-            df['rev_3to2'] = df['release3'] - df['release2']  # 3rd release vs 2nd release
-        elif 'release3' in df.columns and 'release1' in df.columns:
-            df['rev_3to1'] = df['release3'] - df['release1']  # 3rd release vs 1st release
+        if 'release3' in values and 'release2' in values:
+            df['rev_3to2'] = values['release3'] - values['release2']  # 3rd release vs 2nd release
+        elif 'release3' in values and 'release1' in values:
+            df['rev_3to1'] = values['release3'] - values['release1']  # 3rd release vs 1st release
         else:
             df['rev_3to2'] = np.nan
             
         # Final benchmark revision (most important)
-        if 'final' in df.columns and 'release1' in df.columns:
-            df['rev_final'] = df['final'] - df['release1']  # Final vs 1st release
+        if 'final' in values and 'release1' in values:
+            rev_final = values['final'] - values['release1']  # Final vs 1st release
         else:
-            df['rev_final'] = np.nan
+            rev_final = np.nan
+        df['rev_final'] = rev_final
             
-        if 'final' in df.columns and 'release3' in df.columns:
-            df['rev_final_to3'] = df['final'] - df['release3']  # Final vs 3rd release
+        if 'final' in values and 'release3' in values:
+            df['rev_final_to3'] = values['final'] - values['release3']  # Final vs 3rd release
         else:
             df['rev_final_to3'] = np.nan
         
         # Add standard errors and confidence intervals
         df['se'] = self.standard_error
-        df['ci90_lower'] = df['release1'] - self.confidence_interval_90
-        df['ci90_upper'] = df['release1'] + self.confidence_interval_90
+        df['ci90_lower'] = values['release1'] - self.confidence_interval_90
+        df['ci90_upper'] = values['release1'] + self.confidence_interval_90
         
-        # Flag outlier periods (COVID, financial crisis, etc.)
-        df['is_outlier'] = False
+        # Flag outlier periods (COVID, financial crisis, etc.) on a day-resolution date array
+        dates = df['date'].to_numpy(dtype='datetime64[D]')
         
         # COVID period (March 2020 - June 2020)
-        covid_mask = (df['date'] >= '2020-03-01') & (df['date'] <= '2020-06-01')
-        df.loc[covid_mask, 'is_outlier'] = True
+        covid_mask = (dates >= np.datetime64('2020-03-01')) & (dates <= np.datetime64('2020-06-01'))
         
         # Financial crisis (September 2008 - March 2009)
-        crisis_mask = (df['date'] >= '2008-09-01') & (df['date'] <= '2009-03-01')
-        df.loc[crisis_mask, 'is_outlier'] = True
+        crisis_mask = (dates >= np.datetime64('2008-09-01')) & (dates <= np.datetime64('2009-03-01'))
         
-        # Flag extreme revisions (>3 standard deviations)
-        if 'rev_final' in df.columns:
-            extreme_revision_threshold = 3 * self.standard_error
-            extreme_mask = np.abs(df['rev_final']) > extreme_revision_threshold
-            df.loc[extreme_mask, 'is_outlier'] = True
+        # Flag extreme revisions (>3 standard deviations); NaN revisions compare False
+        extreme_revision_threshold = 3 * self.standard_error
+        extreme_mask = np.abs(rev_final) > extreme_revision_threshold
+        
+        df['is_outlier'] = covid_mask | crisis_mask | extreme_mask
         
         logger.info(f"Marked {df['is_outlier'].sum()} records as outliers")
         
@@ -214,16 +240,19 @@ class RevisionMerger:
         Returns:
             DataFrame with additional statistics
         """
-        df = df.copy()
-        
-        # Rolling statistics for revision patterns
-        for col in ['rev_2to1', 'rev_3to2', 'rev_final']:
-            if col in df.columns:
-                # 12-month rolling standard deviation
-                df[f'{col}_rolling_std'] = df[col].rolling(window=12, min_periods=6).std()
-                
-                # 12-month rolling mean
-                df[f'{col}_rolling_mean'] = df[col].rolling(window=12, min_periods=6).mean()
+        # Shallow copy: new columns are added without duplicating the input data
+        df = df.copy(deep=False)
+        
+        # Rolling statistics for revision patterns, one 12-month window over all columns
+        rolling_cols = [col for col in ['rev_2to1', 'rev_3to2', 'rev_final'] if col in df.columns]
+        if rolling_cols:
+            window = df[rolling_cols].rolling(window=12, min_periods=6)
+            rolling_std = window.std()
+            rolling_mean = window.mean()
+            
+            for col in rolling_cols:
+                df[f'{col}_rolling_std'] = rolling_std[col]
+                df[f'{col}_rolling_mean'] = rolling_mean[col]
         
         # Revision direction consistency
         if 'rev_2to1' in df.columns and 'rev_final' in df.columns:
@@ -242,31 +271,75 @@ class RevisionMerger:
         
         return df
     
-    def save_final_dataset(self, df: pd.DataFrame) -> pathlib.Path:
+    def downcast_for_storage(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Narrow dtypes for the binary (Parquet/Feather) outputs
+        
+        Values are in thousands. At today's ~159,000 the float32 step is 2^-6
+        thousand (~16 persons), rising to ~62 persons near 1e6, which is small
+        against the ±136,000 CI but not exact. The CI bounds are narrowed with
+        the releases so they stay consistent with release1 ± 136,000.
+        
+        Args:
+            df: Final DataFrame
+            
+        Returns:
+            DataFrame with float32 value columns and a bool outlier flag
+        """
+        value_cols = ['release1', 'release2', 'release3', 'final',
+                      'rev_2to1', 'rev_3to2', 'rev_3to1', 'rev_final', 'rev_final_to3',
+                      'ci90_lower', 'ci90_upper']
+        dtypes = {col: np.float32 for col in value_cols
+                  if col in df.columns and df[col].dtype == np.float64}
+        if 'is_outlier' in df.columns:
+            dtypes['is_outlier'] = bool
+            
+        return df.astype(dtypes)
+    
+    def save_final_dataset(self, df: pd.DataFrame,
+                           formats: Tuple[str, ...] = ('parquet',)) -> pathlib.Path:
         """
         Save the final merged dataset
         
         Args:
             df: Final DataFrame to save
+            formats: Output formats to write ('parquet', 'csv' and/or 'feather')
             
         Returns:
-            Path to saved file
+            Path to the first saved file
         """
-        # Save as Feather (fast, preserves dtypes)
-        feather_path = self.output_dir / "nfp_revisions.feather"
-        df.to_feather(feather_path)
+        if not formats:
+            raise ValueError("At least one output format is required")
         
-        # Save as CSV for human inspection
-        csv_path = self.output_dir / "nfp_revisions.csv"
-        df.to_csv(csv_path, index=False)
+        unknown_formats = set(formats) - {'parquet', 'csv', 'feather'}
+        if unknown_formats:
+            raise ValueError(f"Unsupported output formats: {sorted(unknown_formats)}")
+        
+        # Binary formats get float32 columns; the CSV the dashboard reads stays at full precision
+        storage_df = self.downcast_for_storage(df)
+        saved_paths = []
         
         # Save as Parquet (compressed, good for ML)
-        parquet_path = self.output_dir / "nfp_revisions.parquet"
-        df.to_parquet(parquet_path, index=False)
+        if 'parquet' in formats:
+            parquet_path = self.output_dir / "nfp_revisions.parquet"
+            storage_df.to_parquet(parquet_path, index=False)
+            saved_paths.append(parquet_path)
+        
+        # Save as CSV for human inspection and the dashboard (slowest to write, so opt-in)
+        if 'csv' in formats:
+            csv_path = self.output_dir / "nfp_revisions.csv"
+            df.to_csv(csv_path, index=False)
+            saved_paths.append(csv_path)
         
-        logger.info(f"Saved final dataset to {feather_path}, {csv_path}, and {parquet_path}")
+        # Save as Feather (fast, preserves dtypes)
+        if 'feather' in formats:
+            feather_path = self.output_dir / "nfp_revisions.feather"
+            storage_df.to_feather(feather_path)
+            saved_paths.append(feather_path)
+        
+        logger.info(f"Saved final dataset to {', '.join(str(path) for path in saved_paths)}")
         
-        return feather_path
+        return saved_paths[0]
     
     def generate_summary_report(self, df: pd.DataFrame) -> Dict:
         """
@@ -278,6 +351,11 @@ class RevisionMerger:
         Returns:
             Dictionary with summary statistics
         """
+        # Count missing values for all tracked columns in one vectorized pass
+        tracked_cols = ['release1', 'release2', 'release3', 'final']
+        present_cols = [col for col in tracked_cols if col in df.columns]
+        na_counts = dict(zip(present_cols, df[present_cols].isna().to_numpy().sum(axis=0).tolist()))
+
         report = {
             'dataset_info': {
                 'total_records': len(df),
@@ -285,29 +363,29 @@ class RevisionMerger:
                     'start': str(df['date'].min()),
                     'end': str(df['date'].max())
                 },
-                'missing_data': {
-                    'release1': df['release1'].isna().sum(),
-                    'release2': df['release2'].isna().sum() if 'release2' in df.columns else 'N/A',
-                    'release3': df['release3'].isna().sum() if 'release3' in df.columns else 'N/A',
-                    'final': df['final'].isna().sum()
-                }
+                'missing_data': {col: na_counts.get(col, 'N/A') for col in tracked_cols}
             }
         }
         
         # Revision statistics
         if 'rev_final' in df.columns:
-            rev_final_clean = df['rev_final'].dropna()
-            if len(rev_final_clean) > 0:
+            rev_final = df['rev_final'].to_numpy(dtype=np.float64)
+            rev_final_clean = rev_final[~np.isnan(rev_final)]
+            if rev_final_clean.size > 0:
+                # Negative/zero/positive counts from a single bincount over the signs
+                n_negative, n_zero, n_positive = np.bincount(
+                    (np.sign(rev_final_clean) + 1).astype(np.intp), minlength=3
+                ).tolist()
                 report['revision_statistics'] = {
                     'mean_revision': float(rev_final_clean.mean()),
-                    'median_revision': float(rev_final_clean.median()),
-                    'std_revision': float(rev_final_clean.std()),
+                    'median_revision': float(np.median(rev_final_clean)),
+                    'std_revision': float(rev_final_clean.std(ddof=1)),
                     'max_positive_revision': float(rev_final_clean.max()),
                     'max_negative_revision': float(rev_final_clean.min()),
                     'revision_frequency': {
-                        'positive': int((rev_final_clean > 0).sum()),
-                        'negative': int((rev_final_clean < 0).sum()),
-                        'zero': int((rev_final_clean == 0).sum())
+                        'positive': n_positive,
+                        'negative': n_negative,
+                        'zero': n_zero
                     }
                 }
         
@@ -340,8 +418,7 @@ def main():
         if not bls_df.empty:
             merged_df = merger.merge_datasets(fred_df, bls_df)
         else:
-            merged_df = fred_df.copy()
-            merged_df.rename(columns={'DATE': 'date'}, inplace=True)
+            merged_df = fred_df.rename(columns={'DATE': 'date'})
         
         # Calculate revisions
         logger.info("Calculating revisions...")
@@ -352,7 +429,8 @@ def main():
         final_df = merger.add_summary_statistics(final_df)
         
         # Save final dataset
-        output_path = merger.save_final_dataset(final_df)
+        # The dashboard fetches nfp_revisions.csv, so write it alongside the Parquet file
+        output_path = merger.save_final_dataset(final_df, formats=('parquet', 'csv'))
         
         # Generate summary report
         summary = merger.generate_summary_report(final_df)